@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+yfinance 取得結果のディスクキャッシュ
+- docs/outputs/.cache/ に Parquet(zstd) で保存（キーの SHA1 をファイル名に使う）
+- TTL 以内ならネットワークに出ずキャッシュを返す（1分足: 60秒, 日足: 1時間。手元での再実行向け）
+- 読めない/壊れたキャッシュは無視してそのまま取得し直す
+- 1分足は前回キャッシュに直近1日分だけを取り直して継ぎ足す
+"""
+
+import hashlib
+import time
+from pathlib import Path
+
+import pandas as pd
+
+yf = None
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / "docs" / "outputs" / ".cache"
+
+# interval ごとの有効期限（秒）
+TTL_SECONDS = {"1m": 60, "1d": 60 * 60}
+# 継ぎ足しに使ってよいキャッシュの古さ（これより古ければ全期間を取り直す）
+# intraday ワークフローは平日1回なので、金曜→月曜の週末をまたいでも使えるようにする
+TAIL_MAX_AGE = 4 * 24 * 60 * 60
+
+
+def _yf():
+    """yfinance（import に ~0.7s）は実際にダウンロードするときだけ読み込む"""
+    global yf
+    import yfinance as yf
+    return yf
+
+
+def _cache_path(key) -> Path:
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{digest}.parquet"
+
+
+def _age(path: Path) -> float | None:
+    try:
+        return time.time() - path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read(path: Path) -> pd.DataFrame | None:
+    try:
+        return pd.read_parquet(path, engine="pyarrow")
+    except Exception:
+        return None
+
+
+def _write(path: Path, df: pd.DataFrame):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, engine="pyarrow", compression="zstd")
+    except Exception:
+        # キャッシュ書き込みの失敗で本処理は止めない
+        pass
+
+
+def _last_sessions(df: pd.DataFrame, days: int) -> pd.DataFrame:
+    sessions = df.index.normalize().unique()
+    if len(sessions) <= days:
+        return df
+    return df[df.index >= sessions[-days]]
+
+
+def cached_download(key, ttl_seconds: float, fn) -> pd.DataFrame:
+    """
+    key に対応するキャッシュが ttl_seconds 以内なら返し、そうでなければ fn() を呼んで保存する。
+    key は repr() できる値（tuple など）。空の結果は保存しない。
+    """
+    path = _cache_path(key)
+    age = _age(path)
+    if age is not None and age < ttl_seconds:
+        cached = _read(path)
+        if cached is not None and not cached.empty:
+            return cached
+
+    df = fn()
+    if df is not None and not df.empty:
+        _write(path, df)
+    return df
+
+
+def get_history(ticker: str, period: str | None = None, interval: str = "1d",
+                start: str | None = None, **kwargs) -> pd.DataFrame:
+    """
+    yf.download のキャッシュ付き版。kwargs はそのまま yf.download に渡す（キーにも含める）。
+    period の代わりに start を指定した場合は start で取得する。
+    """
+    key = ("history", ticker, interval, period, start, sorted(kwargs.items()))
+    ttl = TTL_SECONDS.get(interval, TTL_SECONDS["1d"])
+
+    def fetch():
+        if start is not None:
+            return _yf().download(ticker, start=start, interval=interval, **kwargs)
+        return _yf().download(ticker, period=period, interval=interval, **kwargs)
+
+    return cached_download(key, ttl, fetch)
+
+
+def get_intraday(ticker: str, days: int = 5, **kwargs) -> pd.DataFrame:
+    """
+    1ティッカーの1分足を直近 days 営業日分返す（yf.Ticker.history。列はフラット）。
+    キャッシュが古い場合も前日までの分は再利用し、period=1d だけ取り直して結合する。
+    kwargs はそのまま history() に渡す。
+    """
+    path = _cache_path(("intraday", ticker, days, sorted(kwargs.items())))
+    age = _age(path)
+    cached = _read(path) if age is not None and age < TAIL_MAX_AGE else None
+
+    def fetch(period):
+        return _yf().Ticker(ticker).history(period=period, interval="1m", **kwargs)
+
+    if cached is not None and not cached.empty:
+        if age < TTL_SECONDS["1m"]:
+            return cached
+        fresh = fetch("1d")
+        if fresh is None or fresh.empty:
+            return cached
+        df = pd.concat([cached[cached.index < fresh.index.min()], fresh])
+        df = _last_sessions(df, days)
+    else:
+        df = fetch(f"{days}d")
+        if df is None or df.empty:
+            return df
+
+    _write(path, df)
+    return df
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+scripts/ 共通の定数とヘルパー
+- 出力パス・構成銘柄・タイムゾーン / JST 現在時刻（メモ化）
+- 指数レベルの読み込み（Parquet 優先、CSV フォールバック）
+- CSV 書き出し（pyarrow）/ JSON 生成（orjson）/ 3点移動平均 / ダークテーマ / PNG 保存
+重い import（pandas / numpy / matplotlib）は各関数の中で行う。
+"""
+
+import time
+from datetime import timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+OUT_DIR = ROOT / "docs" / "outputs"
+
+INTRADAY_CSV = OUT_DIR / "qbit_5_intraday.csv"
+INTRADAY_PARQUET = OUT_DIR / "qbit_5_intraday.parquet"
+INTRADAY_PNG = OUT_DIR / "qbit_5_intraday.png"
+LEVELS_CSV = OUT_DIR / "qbit_5_levels.csv"
+LEVELS_PARQUET = OUT_DIR / "qbit_5_levels.parquet"
+STATS_JSON = OUT_DIR / "qbit_5_stats.json"
+
+TICKERS = ["IONQ", "QBTS", "RGTI", "ARQQ", "QUBT"]
+
+JST = timezone(timedelta(hours=9))
+JST_OFFSET_SECONDS = 9 * 60 * 60
+
+
+@lru_cache(maxsize=4)
+def _now_jst_str(fmt: str, bucket: int) -> str:
+    # datetime を作らず UNIX 秒 + 9h を gmtime で struct_time にして整形
+    return time.strftime(fmt, time.gmtime(time.time() + JST_OFFSET_SECONDS))
+
+
+def now_jst_str(fmt: str = "%Y/%m/%d %H:%M") -> str:
+    """JST の現在時刻文字列。30秒単位でメモ化（1回の実行内では同じ値になる）"""
+    return _now_jst_str(fmt, int(time.time()) // 30)
+
+
+def load_levels():
+    """
+    保存済みの日次レベル（index: date, name: level）を返す。
+    無い/壊れている場合は None。
+    """
+    import pandas as pd
+
+    if LEVELS_PARQUET.exists():
+        try:
+            s = pd.read_parquet(LEVELS_PARQUET, engine="pyarrow")["level"]
+            if len(s) > 0:
+                return s
+        except Exception:
+            pass
+    if LEVELS_CSV.exists():
+        try:
+            df = pd.read_csv(LEVELS_CSV)
+            # 必須カラム検証＋空チェック
+            if set(["date", "level"]).issubset(df.columns) and len(df) > 0:
+                df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d", cache=True)
+                return df.set_index("date")["level"]
+        except Exception:
+            pass
+    return None
+
+
+def write_csv(df, path, date_columns=(), float_digits=6):
+    """
+    pyarrow の C++ CSV ライタで書き出す（index も列として出力。ヘッダはクォートしない）。
+    - float 列は float_digits 桁に丸める
+    - 日時列は秒精度（tz 付きは UTC の "...Z" 表記）、date_columns は YYYY-MM-DD
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    tbl = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+    cols = []
+    for field, col in zip(tbl.schema, tbl.columns):
+        if pa.types.is_floating(field.type):
+            col = pc.round(col, float_digits)
+        elif pa.types.is_timestamp(field.type):
+            if field.name in date_columns:
+                col = col.cast(pa.date32())
+            else:
+                # tz 付きは UTC に揃える（"-05:00" のような固定オフセットは
+                # pyarrow<22 の CSV ライタで ArrowInvalid になり、22 以降も "Z" にならない）
+                tz = "UTC" if field.type.tz else None
+                col = pc.cast(col, pa.timestamp("s", tz), safe=False)
+        cols.append(col)
+    # pyarrow はヘッダの列名を必ずクォートする（quoting_header は新しい版のみ）ので、
+    # ヘッダ行は従来どおり素の "a,b" で自前で書き、本体だけを pyarrow に任せる
+    with open(path, "wb") as f:
+        f.write((",".join(tbl.column_names) + "\n").encode("utf-8"))
+        pacsv.write_csv(
+            pa.Table.from_arrays(cols, names=tbl.column_names), f,
+            write_options=pacsv.WriteOptions(include_header=False),
+        )
+
+
+def dumps_json(obj) -> bytes:
+    """
+    インデント2・非ASCIIそのままの JSON（UTF-8 bytes）。orjson があれば使い、無ければ標準 json。
+    """
+    try:
+        import orjson
+    except ImportError:
+        import json
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+
+def smooth3(a):
+    """
+    3点の後方移動平均。rolling(3, min_periods=1).mean() と同じ結果を
+    np.convolve 1回で計算する（NaN は除外して平均、先頭は点数の少ない平均）。
+    """
+    import numpy as np
+
+    a = np.asarray(a, dtype=np.float32)
+    valid = ~np.isnan(a)
+    k = np.ones(3, dtype=np.float32)
+    total = np.convolve(np.where(valid, a, 0.0), k)[: a.size]
+    count = np.convolve(valid.astype(np.float32), k)[: a.size]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def pyplot():
+    """Agg を固定してから pyplot を返す（ヘッドレス前提。GUI バックエンドの探索をしない）"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def dark_axes():
+    pyplot().rcParams.update({
+        "figure.facecolor": "#0b1420",
+        "axes.facecolor":   "#0b1420",
+        "savefig.facecolor":"#0b1420",
+        "axes.edgecolor":   "#1c2a3a",
+        "axes.labelcolor":  "#cfe6f3",
+        "xtick.color":      "#9fb6c7",
+        "ytick.color":      "#9fb6c7",
+        "grid.color":       "#1f2d3d",
+        "font.size":        12,
+        "axes.titleweight": "bold",
+    })
+
+
+def save_png(fig, path, dpi=None):
+    """
+    tight_layout 済みの前提で保存（bbox_inches="tight" は2回描画になるので使わない）。
+    zlib は軽め（compress_level=3）。dpi=None なら Figure の dpi。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi if dpi is not None else "figure",
+                pil_kwargs={"compress_level": 3, "optimize": False})
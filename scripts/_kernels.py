@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+数値カーネル（numba があれば JIT、無ければ同じ結果の NumPy 版）
+- equal_weight: 始値で正規化した等加重「始値比（%）」を1パスで計算
+- level: 基準日終値で正規化した等加重の指数レベル（基準=100）を1パスで計算
+equal_weight は割り算のまま（float32 の x * (1/x) は 1 にならず、始値の行が 0 からずれるため）。
+level は基準値の逆数を float64 で1回だけ求め、float64 で掛けてから float32 に格納する。
+numba は任意依存（requirements には含めない）。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba 未導入 → NumPy 版を使う
+    njit = None
+
+# fastmath から nnan/ninf を外す（NaN 判定 v == v を消されないように）
+# arcp も外す（割り算を逆数の掛け算に置き換えられると始値比が 0 にならない）
+_FASTMATH = {"nsz", "contract", "afn", "reassoc"}
+
+
+def _equal_weight_loop(arr, opens):
+    n, m = arr.shape
+    out = np.empty(n, dtype=np.float32)
+    for i in range(n):
+        s = 0.0
+        c = 0
+        for j in range(m):
+            v = arr[i, j] / opens[j]
+            if v == v:
+                s += v
+                c += 1
+        out[i] = (s / c - 1.0) * 100.0 if c else np.nan
+    return out
+
+
+def _equal_weight_numpy(arr, opens):
+    # 割り算の結果バッファ1つだけを使い回す（-1.0 も in-place）。集計も float32 のまま
+    rel = np.divide(arr, opens)
+    np.subtract(rel, 1.0, out=rel)
+    return np.nanmean(rel, axis=1, dtype=np.float32) * 100.0
+
+
+def _level_loop(arr, base):
+    n, m = arr.shape
+    recip = 1.0 / base.astype(np.float64)
+    out = np.empty(n, dtype=np.float32)
+    for i in range(n):
+        s = 0.0
+        c = 0
+        for j in range(m):
+            v = arr[i, j] * recip[j]
+            if v == v:
+                s += v
+                c += 1
+        out[i] = s * 100.0 / c if c else np.nan
+    return out
+
+
+def _level_numpy(arr, base):
+    rel = arr * np.reciprocal(base.astype(np.float64))
+    return (np.nanmean(rel, axis=1) * 100.0).astype(np.float32)
+
+
+if njit is not None:
+    equal_weight = njit(cache=True, fastmath=_FASTMATH)(_equal_weight_loop)
+    level = njit(cache=True, fastmath=_FASTMATH)(_level_loop)
+else:
+    equal_weight = _equal_weight_numpy
+    level = _level_numpy
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Yahoo Finance の spark エンドポイントから終値だけを直接取得する
+- 全ティッカーを1リクエストで取得し、JSON を1回パース（orjson があれば使う）
+- 戻り値は横持ち DataFrame（index: UTC 日時, 列: ティッカー）
+yfinance を経由しないため、失敗したら呼び出し側で yfinance にフォールバックすること。
+"""
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson 未導入 → 標準 json
+    import json
+    _loads = json.loads
+
+SPARK_URL = "https://query1.finance.yahoo.com/v7/finance/spark"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# モジュール共通のセッション（keep-alive で TCP/TLS ハンドシェイクを使い回す）
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.2,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",)),
+))
+
+
+def _parse_spark(obj) -> dict:
+    """{symbol: (timestamp[int64], close[float64])} に変換"""
+    out = {}
+    # v7: {"spark": {"result": [{"symbol": ..., "response": [{"timestamp", "indicators"}]}]}}
+    for r in (obj.get("spark") or {}).get("result") or []:
+        for chart in r.get("response") or []:
+            ts = chart.get("timestamp")
+            quote = ((chart.get("indicators") or {}).get("quote") or [{}])[0]
+            close = quote.get("close")
+            if ts and close:
+                out[r["symbol"]] = (np.asarray(ts, dtype=np.int64),
+                                    np.asarray(close, dtype=np.float64))
+    return out
+
+
+def spark_close(tickers, range_: str = "5d", interval: str = "1m",
+                timeout: float = 10) -> pd.DataFrame:
+    resp = _SESSION.get(
+        SPARK_URL,
+        params={"symbols": ",".join(tickers), "range": range_, "interval": interval},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    series = _parse_spark(_loads(resp.content))
+    if not series:
+        return pd.DataFrame()
+
+    # 全銘柄の timestamp の和集合に揃えて (T, N) の配列を一度に作る
+    ts = np.unique(np.concatenate([t for t, _ in series.values()]))
+    arr = np.full((ts.size, len(tickers)), np.nan)
+    for j, sym in enumerate(tickers):
+        if sym in series:
+            t, c = series[sym]
+            arr[np.searchsorted(ts, t), j] = c
+
+    index = pd.to_datetime(ts, unit="s", utc=True)
+    return pd.DataFrame(arr, index=index, columns=list(tickers))
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+QBIT-5 intraday outputs (one entry point, dispatched by subcommand)
+- chart: docs/outputs/qbit_5_intraday.parquet / .csv から当日チャートを描画
+  （Parquet/CSVは snapshot スクリプトが出力。index: timestamp_utc, col: pct_vs_open）
+- post : qbit_5_stats.json から X 投稿文（qbit_5_post_intraday.txt / post_intraday.txt）を生成
+- 休場/データ薄い場合でもエラーにせず静かに終了
+
+usage: python scripts/intraday.py {chart,post}
+"""
+
+import argparse
+import json
+import sys
+
+from _common import (
+    INTRADAY_CSV, INTRADAY_PARQUET, INTRADAY_PNG, OUT_DIR, STATS_JSON, TICKERS, JST,
+    dark_axes, now_jst_str, pyplot, save_png, smooth3,
+)
+
+
+# ---------------------------------------------------------------- chart
+
+# 値の列（pct_vs_open と旧形式の別名）
+VALUE_COLUMNS = ["pct_vs_open", "change_pct", "pct", "value"]
+
+
+def _read_csv_arrow():
+    """
+    pyarrow のマルチスレッド CSV リーダで読む（timestamp_utc を UTC 日時、値を float32 で）。
+    pyarrow が無い/形式が合わない場合は None（pandas で読み直す）。
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return None
+
+    types = {c: pa.float32() for c in VALUE_COLUMNS}
+    types["timestamp_utc"] = pa.timestamp("us", "UTC")
+    try:
+        tbl = pacsv.read_csv(
+            INTRADAY_CSV, convert_options=pacsv.ConvertOptions(column_types=types)
+        )
+    except (pa.ArrowInvalid, OSError):
+        return None
+    if "timestamp_utc" not in tbl.column_names:
+        return None
+    return tbl.to_pandas().set_index("timestamp_utc")
+
+
+def _read_intraday():
+    import numpy as np
+    import pandas as pd
+
+    # Parquet を優先（列型・タイムゾーン付き日時がそのまま戻る）
+    if INTRADAY_PARQUET.exists():
+        try:
+            return pd.read_parquet(INTRADAY_PARQUET, engine="pyarrow")
+        except Exception:
+            pass
+
+    df = _read_csv_arrow()
+    if df is not None:
+        return df
+
+    # 読み込み（index: timestamp_utc）。値の列は最初から float32 で受け取る
+    dtypes = {c: np.float32 for c in VALUE_COLUMNS}
+    df = pd.read_csv(INTRADAY_CSV, dtype=dtypes, engine="c")
+    if "timestamp_utc" in df.columns:
+        # snapshot が書く ISO8601（UTC。例: 2026-01-20 14:30:00Z / 旧形式: 2026-01-20T09:30:00-05:00）
+        dt = pd.to_datetime(
+            df["timestamp_utc"], format="ISO8601", cache=True, utc=True
+        )
+        df.index = dt
+        df = df.drop(columns=["timestamp_utc"])
+    else:
+        # 古い形式への後方互換（index列が残ってくるケース）
+        if not isinstance(df.index, pd.DatetimeIndex):
+            df.index = pd.to_datetime(df.index, utc=True)
+    return df
+
+
+def load():
+    if not (INTRADAY_PARQUET.exists() or INTRADAY_CSV.exists()):
+        print("intraday csv not found; skip chart")
+        sys.exit(0)
+
+    df = _read_intraday()
+
+    # 欠損・重複整理（snapshot 出力は時系列順なので通常は並べ替え不要）
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    df = df[~df.index.duplicated(keep="last")].copy()
+
+    # JSTへ（表示を日本時間に揃える）
+    df.index = df.index.tz_convert(JST)
+
+    # 列名を保証
+    if "pct_vs_open" not in df.columns:
+        # 旧: change_pct などがあれば拾っておく
+        for c in VALUE_COLUMNS[1:]:
+            if c in df.columns:
+                df = df.rename(columns={c: "pct_vs_open"})
+                break
+    if "pct_vs_open" not in df.columns:
+        print("no pct_vs_open column; skip chart")
+        sys.exit(0)
+
+    # データが薄いときは描画スキップ
+    if len(df) < 10:
+        print("intraday points < 10; skip chart")
+        sys.exit(0)
+
+    return df[["pct_vs_open"]]
+
+
+def pct_formatter(x, pos):
+    return f"{x:.1f}%"
+
+
+def chart():
+    df = load()
+
+    import pandas as pd
+    from matplotlib.ticker import FuncFormatter, AutoMinorLocator
+
+    plt = pyplot()
+    dark_axes()
+
+    last = float(df["pct_vs_open"].iloc[-1])
+    up_color   = "#10b981"  # 緑
+    down_color = "#fb7185"  # 赤
+    line_color = up_color if last >= 0 else down_color
+    fill_color = line_color
+
+    # 滑らかさ向上（3分移動平均）
+    s = pd.Series(smooth3(df["pct_vs_open"].to_numpy()), index=df.index)
+
+    fig = plt.figure(figsize=(15, 8.5), dpi=150)
+    ax  = fig.add_subplot(111)
+
+    # グリッドを細かく
+    ax.grid(True, which="major", linestyle="-", linewidth=0.8, alpha=0.6)
+    ax.grid(True, which="minor", linestyle=":", linewidth=0.5, alpha=0.35)
+    ax.yaxis.set_minor_locator(AutoMinorLocator())
+
+    # 0% ライン
+    ax.axhline(0.0, color="#284056", linewidth=1.0)
+
+    # ライン＆面（データ系列だけラスタ化。軸・文字はベクタのまま）
+    (ln,) = ax.plot(s.index, s.values, linewidth=2.2, color=line_color)
+    ln.set_rasterized(True)
+    poly = ax.fill_between(s.index, s.values, 0, where=None, alpha=0.16, color=fill_color)
+    poly.set_rasterized(True)
+
+    # 軸ラベル
+    ax.set_ylabel("Change vs Open (%)")
+    ax.yaxis.set_major_formatter(FuncFormatter(pct_formatter))
+
+    # 余白
+    ax.margins(x=0.01)
+
+    # タイトル（JST）
+    updated_jst = df.index[-1].astimezone(JST).strftime("%Y/%m/%d %H:%M (JST)")
+    ax.set_title(f"QBIT-5 Intraday Snapshot ({updated_jst})", color="#e6f2fb", pad=14)
+
+    # 上下に少し余裕
+    ypad = max(1.0, (s.max() - s.min()) * 0.1)
+    ax.set_ylim(s.min() - ypad, s.max() + ypad)
+
+    # 保存
+    save_png(fig, INTRADAY_PNG)
+    plt.close(fig)
+    print(f"saved {INTRADAY_PNG} (last={last:+.2f}%)")
+
+
+# ---------------------------------------------------------------- post
+
+def jst_now_str():
+    return now_jst_str("%Y/%m/%d %H:%M (JST)")
+
+
+def fmt_pct(x: float) -> str:
+    # 表示は小数点2桁、符号付き
+    sign = "+" if x >= 0 else ""
+    return f"{sign}{x:.2f}%"
+
+
+def post():
+    if not STATS_JSON.exists():
+        raise FileNotFoundError(f"stats not found: {STATS_JSON}")
+
+    data = json.loads(STATS_JSON.read_text(encoding="utf-8"))
+
+    # 互換フィールド名：pct_intraday / rtn_intraday など
+    pct = None
+    for k in ["pct_intraday", "intraday_pct", "change_pct", "pct", "rtn_pct"]:
+        v = data.get(k)
+        if isinstance(v, (int, float)):
+            pct = float(v)
+            break
+    if pct is None:
+        raise RuntimeError("pct_intraday missing in stats")
+
+    tickers = data.get("tickers", [])
+    tickers_str = ",".join(tickers) if tickers else ",".join(TICKERS)
+
+    # 見出し・本文
+    title = "【QBIT-5｜量子コンピューター指数】"
+    line1 = f"本日: {fmt_pct(pct)}"
+    last_level = data.get("last_level")
+    line2 = f"指数: {last_level:.2f}" if isinstance(last_level, (int, float)) else ""
+    line3 = f"構成: {tickers_str}"
+    ts = data.get("updated_at") or jst_now_str()
+    footer = f"更新: {ts}"
+    hashtags = "#桜Index #QBIT5"
+
+    body = "\n".join([title, line1, line2, line3, hashtags])
+
+    # 2 か所に同一内容を書き出す（サイト側は post_intraday.txt を見に行く場合があるため）
+    targets = [
+        OUT_DIR / "qbit_5_post_intraday.txt",
+        OUT_DIR / "post_intraday.txt",
+    ]
+    for p in targets:
+        p.write_text(body, encoding="utf-8")
+
+    print("written:", ", ".join(str(p) for p in targets))
+
+
+# ---------------------------------------------------------------- CLI
+
+COMMANDS = {
+    "chart": chart,
+    "post": post,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QBIT-5 intraday chart / post text")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
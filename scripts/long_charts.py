@@ -1,62 +1,145 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from pathlib import Path
-import yfinance as yf
 
-OUT_DIR = Path("docs/outputs")
-TICKERS = ["IONQ", "QBTS", "RGTI", "ARQQ", "QUBT"]
+import _common
+import _kernels
+from _common import LEVELS_CSV, LEVELS_PARQUET, OUT_DIR, TICKERS, pyplot, save_png, write_csv
+
 BASE_DATE = "2024-01-02"
+HISTORY_START = "2023-09-01"
+# 構成銘柄の日次終値（append-only）。レベルはここから再計算する
+CLOSES_PARQUET = OUT_DIR / "qbit_5_closes.parquet"
+# 差分取得時に取り直す日数（直近の確定値・調整の反映用）
+OVERLAP_DAYS = 5
 
-def _recalc_and_save():
-    df = yf.download(" ".join(TICKERS), start="2023-09-01",
+def _download_closes(start: str) -> pd.DataFrame:
+    # yfinance（_cache 経由）は取得が必要なときだけ import する
+    from _cache import get_history
+
+    df = get_history(" ".join(TICKERS), start=start,
                      interval="1d", auto_adjust=True, progress=False, group_by="column")
+    if df is None or df.empty:
+        raise RuntimeError(f"no daily data since {start}")
+    # group_by="column" → 列は (項目, Ticker)。Close だけを直接切り出す
     if isinstance(df.columns, pd.MultiIndex):
-        df = df["Close"].copy()
-    else:
-        if "Close" in df.columns:
-            df = df[["Close"]].copy()
-            df.columns = [TICKERS[0]]
-    df = df.ffill().dropna(how="all")
-    base_row = df.loc[:pd.to_datetime(BASE_DATE)].iloc[-1]
-    level = (df.divide(base_row).mean(axis=1) * 100.0)
-    lv = level.reset_index()
-    lv.columns = ["date", "level"]
+        df = df.xs("Close", axis=1, level=0)
+    elif "Close" in df.columns:
+        df = df[["Close"]].set_axis([TICKERS[0]], axis=1)
+    return df.reindex(columns=TICKERS)
+
+def _calc_level(closes: pd.DataFrame) -> pd.Series:
+    df = closes.ffill()
+    # pandas の整列を通さず、float32 の ndarray で割り算→行平均（numba があれば1パス）
+    arr = df.to_numpy(dtype=np.float32)
+    # ffill 後に全欠損で残るのは両端だけなので、dropna(how="all") ではなく両端を切る
+    mask = ~np.isnan(arr).all(axis=1)
+    if not mask.any():
+        raise RuntimeError("no daily closes")
+    first, last = mask.argmax(), len(mask) - mask[::-1].argmax()
+    index = df.index[first:last]
+    arr = np.ascontiguousarray(arr[first:last])
+    # 基準行 = BASE_DATE 以前の最終行（.loc スライスを作らず位置で引く）
+    pos = index.searchsorted(pd.Timestamp(BASE_DATE), side="right") - 1
+    if pos < 0:
+        raise RuntimeError(f"no closes on or before base date {BASE_DATE}")
+    base = arr[pos]
+    lvl = _kernels.level(arr, base)
+    return pd.Series(lvl, index=index, name="level").rename_axis("date")
+
+def _save_levels(closes: pd.DataFrame) -> pd.Series:
+    level = _calc_level(closes)
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    lv.to_csv(OUT_DIR / "qbit_5_levels.csv", index=False)
+    closes.to_parquet(CLOSES_PARQUET, engine="pyarrow", compression="zstd")
+    # Parquet が正。CSV はサイト/互換用のサイドカー
+    level.to_frame().to_parquet(LEVELS_PARQUET, engine="pyarrow", compression="zstd")
+    write_csv(level.to_frame(), LEVELS_CSV, date_columns=("date",))
     return level
 
+def _recalc_and_save():
+    return _save_levels(_download_closes(HISTORY_START))
+
+def _adjusted_since(old: pd.DataFrame, new: pd.DataFrame) -> bool:
+    """重なった日付で保存済み終値と新規取得分が銘柄ごとに一致しなければ True"""
+    overlap = old.index.intersection(new.index)
+    if overlap.empty:
+        return False
+    a = old.loc[overlap].to_numpy(dtype=np.float64)
+    b = new.loc[overlap].to_numpy(dtype=np.float64)
+    # NaN はどちらか片方だけの欠損（直近の未確定など）なら比較から外す
+    both = ~(np.isnan(a) | np.isnan(b))
+    for j in range(a.shape[1]):
+        m = both[:, j]
+        if m.any() and not np.allclose(a[m, j], b[m, j], rtol=1e-6, equal_nan=True):
+            return True
+    return False
+
+def _incremental_update():
+    """
+    保存済み終値の last_date - OVERLAP_DAYS 以降だけを取得して継ぎ足し、レベルを作り直す。
+    重なった日付は新しく取得した値を採用。終値履歴が無ければ全期間を取得する。
+    """
+    try:
+        old = pd.read_parquet(CLOSES_PARQUET, engine="pyarrow")
+    except Exception:
+        old = None
+    if old is None or old.empty:
+        return _recalc_and_save()
+
+    last_date = old.index.max()
+    start = (last_date - pd.Timedelta(days=OVERLAP_DAYS)).strftime("%Y-%m-%d")
+    new = _download_closes(start).reindex(columns=old.columns)
+    # auto_adjust=True は分割・配当で過去の価格ごと遡って調整する。
+    # 重なった日付の値が保存済みとずれていたら、差分ではなく全期間を取り直す
+    if _adjusted_since(old, new):
+        print("closes re-adjusted upstream; recalculating full history")
+        return _recalc_and_save()
+    closes = pd.concat([old, new])
+    closes = closes[~closes.index.duplicated(keep="last")]
+    if not closes.index.is_monotonic_increasing:
+        closes = closes.sort_index()
+    return _save_levels(closes)
+
 def load_levels():
-    csv = OUT_DIR / "qbit_5_levels.csv"
-    if csv.exists():
-        try:
-            df = pd.read_csv(csv)
-            # 必須カラム検証＋空チェック
-            if set(["date", "level"]).issubset(df.columns) and len(df) > 0:
-                df["date"] = pd.to_datetime(df["date"])
-                return df.set_index("date")["level"]
-        except Exception:
-            pass
+    # 終値履歴から差分更新（取得に失敗したら保存済みレベルを使う）
+    try:
+        return _incremental_update()
+    except Exception as e:
+        print(f"levels update failed ({e}); using saved levels")
+    s = _common.load_levels()
+    if s is not None:
+        return s
     # 壊れている/無い → 再計算して保存
     return _recalc_and_save()
 
-def _save(s: pd.Series, name: str, title: str):
-    fig, ax = plt.subplots(figsize=(9, 4))
-    ax.plot(s.index, s.values)
+def _tail(s: pd.Series, win: str) -> pd.Series:
+    # Series.last(offset) 相当（pandas 2.2 で非推奨、3.0 で削除）
+    return s[s.index > s.index[-1] - pd.Timedelta(win)]
+
+def _save(fig, ax, s: pd.Series, name: str, title: str):
+    # Figure/Axes は main で1回だけ作り、描画ごとに中身だけ消して使い回す
+    ax.clear()
+    (ln,) = ax.plot(s.index, s.values)
+    ln.set_rasterized(True)
     ax.set_title(title)
     ax.grid(True, linestyle="--", alpha=0.3)
-    fig.tight_layout()
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
-    fig.savefig(OUT_DIR / f"qbit_5_{name}.png", dpi=160)
-    plt.close(fig)
+    save_png(fig, OUT_DIR / f"qbit_5_{name}.png", dpi=160)
 
 def main():
     s = load_levels()
-    _save(s.last("7D"),  "7d", "QBIT-5 (7D)")
-    _save(s.last("35D"), "1m", "QBIT-5 (1M)")
-    _save(s.last("400D"),"1y", "QBIT-5 (1Y)")
+    # 全履歴を切るのは1回だけ。7D/1M は 1Y の末尾から取る
+    base = _tail(s, "400D")
+    plt = pyplot()
+    fig, ax = plt.subplots(figsize=(9, 4))
+    for win, name, title in [
+        ("7D",  "7d", "QBIT-5 (7D)"),
+        ("35D", "1m", "QBIT-5 (1M)"),
+        (None,  "1y", "QBIT-5 (1Y)"),
+    ]:
+        _save(fig, ax, _tail(base, win) if win else base, name, title)
+    plt.close(fig)
 
 if __name__ == "__main__":
     main()
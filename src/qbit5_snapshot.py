@@ -3,20 +3,27 @@
 QBIT-5 snapshot generator (intraday-safe)
 - 直近5営業日の1分足を取り、最新の取引日を自動判定
 - 当日データが無い/薄い場合は前営業日にフォールバック
-- Intraday系列を CSV 出力（scripts/make_intraday_chart.py が使用）
+- Intraday系列を Parquet + CSV 出力し、チャート（scripts/intraday.py chart）を別プロセスで描画
 - stats.json（pct_intraday, updated_at, last_level）を更新
 """
 
+import asyncio
 import os
 import sys
-import json
 import math
-import time
-from datetime import datetime, timedelta, timezone
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
+
+# scripts/ 配下の共通ヘルパー（取得・キャッシュ / 数値カーネル）を使う
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from _cache import TTL_SECONDS, cached_download, get_intraday  # noqa: E402
+from _yahoo import spark_close  # noqa: E402
+from _common import dumps_json, now_jst_str, write_csv  # noqa: E402
+from _kernels import equal_weight  # noqa: E402
 
 JST = timezone(timedelta(hours=9))
 ET = timezone(timedelta(hours=-5))  # ※米国夏時間でも yfinance Index がUTCのため日付判定は後段で安全にやる
@@ -24,49 +31,128 @@ ET = timezone(timedelta(hours=-5))  # ※米国夏時間でも yfinance Index 
 # === 設定 ===
 OUTPUT_DIR = "docs/outputs"
 INTRADAY_CSV = os.path.join(OUTPUT_DIR, "qbit_5_intraday.csv")
+INTRADAY_PARQUET = os.path.join(OUTPUT_DIR, "qbit_5_intraday.parquet")
 LEVELS_CSV = os.path.join(OUTPUT_DIR, "qbit_5_levels.csv")
+LEVELS_PARQUET = os.path.join(OUTPUT_DIR, "qbit_5_levels.parquet")
 STATS_JSON = os.path.join(OUTPUT_DIR, "qbit_5_stats.json")
+LAST_RUN_TXT = os.path.join(OUTPUT_DIR, "last_run.txt")
 
 TICKERS = ["IONQ", "QBTS", "RGTI", "ARQQ", "QUBT"]
 
 # 最低限「当日データがある」とみなすサンプル数（1分足）
 MIN_SAMPLES_TODAY = 30  # 30分ぶん
 
+# yfinance フォールバック時の history() のリクエスト timeout（秒）
+FETCH_TIMEOUT = 10
+
 
 def _ensure_dir(p: str):
     os.makedirs(p, exist_ok=True)
 
 
 def _now_jst_str():
-    return datetime.now(JST).strftime("%Y/%m/%d %H:%M")
+    return now_jst_str("%Y/%m/%d %H:%M")
 
 
-def _download_1m_last_days(tickers, days=5):
-    frames = []
-    for t in tickers:
-        # period=5d, interval=1m を推奨。auto_adjust=True で分割調整後の価格を取得
-        df = yf.download(
-            t, period=f"{days}d", interval="1m",
-            auto_adjust=True, prepost=False, progress=False, threads=False
+def _fetch_close_1m(tickers, days):
+    """
+    直近 days 日の1分足終値を横持ち（index: 日時, 列: ティッカー）で返す。
+    spark エンドポイント（1リクエスト）を優先し、失敗したら yfinance にフォールバック。
+    """
+    try:
+        wide = cached_download(
+            ("spark", tuple(tickers), f"{days}d", "1m"), TTL_SECONDS["1m"],
+            lambda: spark_close(tickers, range_=f"{days}d", interval="1m"),
         )
-        if df is None or df.empty:
-            continue
-        # yfinanceはUTC index。Localize → ETに変換して日付判定に使う
-        if df.index.tz is None:
-            df.index = df.index.tz_localize(timezone.utc)
-        df_et = df.copy()
-        df_et.index = df_et.index.tz_convert(ET)
-        df_et["DateET"] = df_et.index.date
-        df_et["Ticker"] = t
-        frames.append(df_et[["Close", "DateET", "Ticker"]])
-
-        # API叩き過ぎ防止
-        time.sleep(0.2)
-
-    if not frames:
+        if wide is not None and not wide.empty:
+            return wide
+    except Exception as e:
+        print(f"spark fetch failed ({e}); falling back to yfinance")
+
+    # ティッカーごとの取得をスレッドで並行（I/O 待ちが主なので GIL は問題にならない）
+    # period=5d, interval=1m を推奨。auto_adjust=True で分割調整後の価格を取得
+    # （ディスクキャッシュ経由。前日までの分は再取得しない）
+    # 打ち切りは yfinance 側のリクエスト timeout に任せ、全スレッドの終了を待つ
+    # （実行中の history() は外から止められず、後段の fork 前に片付けておく）
+    closes = {}
+    with ThreadPoolExecutor(max_workers=len(tickers)) as pool:
+        futures = {
+            t: pool.submit(get_intraday, t, days=days, auto_adjust=True, prepost=False,
+                           timeout=FETCH_TIMEOUT)
+            for t in tickers
+        }
+        for t, fut in futures.items():
+            try:
+                df = fut.result()
+            except Exception as e:
+                print(f"{t}: 1m fetch failed or timed out ({e}); skipped")
+                continue
+            if df is not None and not df.empty and "Close" in df.columns:
+                closes[t] = df["Close"]
+
+    if not closes:
         return pd.DataFrame()
+    return pd.concat(closes, axis=1)
+
+
+def _write_bytes(path: str, data: bytes):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+async def _write_all(payloads: dict):
+    import aiofiles
+
+    async def _awrite(path, data):
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(data)
 
-    return pd.concat(frames, axis=0).sort_index()
+    await asyncio.gather(*(_awrite(p, d) for p, d in payloads.items()))
+
+
+def _write_payloads(payloads: dict):
+    """
+    先にメモリ上で作った bytes をまとめて書く（途中の flush / fsync はしない）。
+    aiofiles があれば各ファイルの書き込みを並行させ、無ければ1ファイル1回の write で順に書く。
+    """
+    try:
+        import aiofiles  # noqa: F401
+    except ImportError:
+        for path, data in payloads.items():
+            _write_bytes(path, data)
+        return
+    asyncio.run(_write_all(payloads))
+
+
+def _download_1m_last_days(tickers, days=5):
+    wide = _fetch_close_1m(tickers, days)
+    if wide.empty:
+        return pd.DataFrame()
+
+    # 取得元の index はUTC。Localize → ETに変換して日付判定に使う
+    if wide.index.tz is None:
+        wide.index = wide.index.tz_localize(timezone.utc)
+    wide.index = wide.index.tz_convert(ET)
+
+    # 横持ち → 縦持ち（index: Datetime, 列: Ticker/Close）
+    df_et = (
+        wide.rename_axis(index="Datetime", columns="Ticker")
+        .stack().rename("Close").reset_index("Ticker")
+    )
+    df_et = df_et.dropna(subset=["Close"])
+    if df_et.empty:
+        return pd.DataFrame()
+    # ET 日付を int64（その日の 00:00 ET の ns）で持つ。date オブジェクトを行ごとに作らない
+    df_et["DateET"] = df_et.index.normalize().asi8
+
+    df_et = df_et[["Close", "DateET", "Ticker"]]
+    # 取得元は時系列順で返すので、崩れているときだけ並べ替える
+    return df_et if df_et.index.is_monotonic_increasing else df_et.sort_index()
 
 
 def _select_latest_trading_date(df_all: pd.DataFrame) -> pd.DataFrame:
@@ -77,15 +163,15 @@ def _select_latest_trading_date(df_all: pd.DataFrame) -> pd.DataFrame:
     if df_all.empty:
         return df_all
 
-    # 取引日ごとにサンプル数を計算
-    counts = df_all.groupby("DateET").size().sort_index()
+    # 取引日ごとにサンプル数を計算（整数キーの groupby）
+    counts = df_all.groupby("DateET").size()  # groupby はキー順に並ぶ
     # サンプルが十分な日だけ残す
-    valid_days = [d for d, c in counts.items() if c >= MIN_SAMPLES_TODAY]
-    if not valid_days:
+    valid_days = counts.index[counts.to_numpy() >= MIN_SAMPLES_TODAY]
+    if len(valid_days) == 0:
         return pd.DataFrame()
 
     latest_day = valid_days[-1]
-    return df_all[df_all["DateET"] == latest_day].copy()
+    return df_all[df_all["DateET"].to_numpy() == latest_day].copy()
 
 
 def _make_equal_weight_intraday(df_day: pd.DataFrame) -> pd.DataFrame:
@@ -96,23 +182,43 @@ def _make_equal_weight_intraday(df_day: pd.DataFrame) -> pd.DataFrame:
     if df_day.empty:
         return df_day
 
-    out = []
-    # 同一 Timestamp（UTCだがET日付で揃っている）の各ティッカー終値をピボット
-    pivot = df_day.pivot_table(
-        index=df_day.index, columns="Ticker", values="Close", aggfunc="last"
-    ).sort_index()
-
-    # 各ティッカーの「当日オープン（最初のレコード）」で正規化 → 等加重平均
-    open_vals = pivot.ffill().bfill().iloc[0]
-    rel = pivot.div(open_vals) - 1.0  # ratio-1
-    eq = rel.mean(axis=1) * 100.0     # %へ
-
-    s = pd.Series(eq, name="pct_vs_open")
+    # (Timestamp, Ticker) の重複は最後の値を採用してから横持ちに
+    # （pivot_table の集約は使わず、sort + drop_duplicates + unstack で一度に並べ替える）
+    df_day = (
+        df_day.reset_index()
+        .sort_values(["Datetime", "Ticker"], kind="stable")
+        .drop_duplicates(["Datetime", "Ticker"], keep="last")
+    )
+    close = df_day.set_index(["Datetime", "Ticker"])["Close"].unstack("Ticker")
+
+    # 各ティッカーの「当日オープン（最初の有効レコード）」で正規化 → 等加重平均
+    arr = np.ascontiguousarray(close.to_numpy(dtype=np.float32))
+    first_idx = (~np.isnan(arr)).argmax(axis=0)
+    opens = arr[first_idx, np.arange(arr.shape[1])]
+    # 始値が取れない（全欠損）列は割る前に落とす
+    has_open = ~np.isnan(opens)
+    if not has_open.all():
+        arr = np.ascontiguousarray(arr[:, has_open])
+        opens = opens[has_open]
+    eq = equal_weight(arr, opens)             # (ratio-1) の等加重平均を %へ
+
+    s = pd.Series(eq, index=close.index, name="pct_vs_open")
     s.index.name = "timestamp_utc"
     return s.to_frame()
 
 
+def _intraday_pct(intraday: pd.DataFrame) -> float:
+    """最新の始値比（%）。pandas のスカラー取得を通さず ndarray の末尾を読む"""
+    a = intraday["pct_vs_open"].to_numpy()
+    return float(a[-1]) if a.size else 0.0
+
+
 def _load_last_level() -> float | None:
+    if os.path.exists(LEVELS_PARQUET):
+        try:
+            return float(pd.read_parquet(LEVELS_PARQUET, engine="pyarrow")["level"].dropna().iloc[-1])
+        except Exception:
+            pass
     if not os.path.exists(LEVELS_CSV):
         return None
     try:
@@ -127,6 +233,12 @@ def _load_last_level() -> float | None:
     return None
 
 
+def _render_chart():
+    # 子プロセス側で実行（spawn でも pickle できるようモジュール直下に置く）
+    import intraday
+    intraday.chart()
+
+
 def main():
     _ensure_dir(OUTPUT_DIR)
 
@@ -149,11 +261,16 @@ def main():
         print("intraday series empty; skipping without error")
         sys.exit(0)
 
-    # 4) CSVとして保存（チャート生成スクリプトが読み込む）
-    intraday.to_csv(INTRADAY_CSV, index=True)
+    # 4) Parquet（正）+ CSV（互換用）として保存（scripts/intraday.py chart が読み込む）
+    intraday.to_parquet(INTRADAY_PARQUET, engine="pyarrow", compression="zstd")
+    write_csv(intraday, INTRADAY_CSV)
+
+    # チャート描画（savefig が重い）は別プロセスで並行させ、その間に stats 等を書く
+    chart_proc = multiprocessing.Process(target=_render_chart)
+    chart_proc.start()
 
     # 5) stats.json を更新（pct_intraday / updated_at / last_level）
-    pct_intraday = float(intraday["pct_vs_open"].iloc[-1])
+    pct_intraday = _intraday_pct(intraday)
     updated_at = _now_jst_str()
     last_level = _load_last_level()
 
@@ -166,14 +283,18 @@ def main():
         "tickers": TICKERS,
     }
 
-    with open(STATS_JSON, "w", encoding="utf-8") as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    # 6) stats.json と走行記録は内容を先に作ってからまとめて書く
+    _write_payloads({
+        STATS_JSON: dumps_json(stats),
+        LAST_RUN_TXT: f"intraday snapshot OK @ {updated_at}\n".encode("utf-8"),
+    })
 
-    # 6) 走行記録
-    with open(os.path.join(OUTPUT_DIR, "last_run.txt"), "w", encoding="utf-8") as f:
-        f.write(f"intraday snapshot OK @ {updated_at}\n")
+    chart_proc.join()
+    if chart_proc.exitcode != 0:
+        print(f"intraday chart failed (exit={chart_proc.exitcode})")
+        sys.exit(1)
 
-    print("snapshot done; intraday.csv + stats.json written.")
+    print("snapshot done; intraday.parquet/csv + stats.json + chart written.")
 
 
 if __name__ == "__main__":